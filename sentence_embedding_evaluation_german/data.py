@@ -5,16 +5,209 @@ import sqlite3
 import sklearn.model_selection
 import json
 import itertools
+import functools
+import hashlib
+import os
+import tempfile
+from typing import List, Callable
+try:
+    import pyarrow
+    import pyarrow.csv as pacsv
+except ImportError:
+    pacsv = None
+
+
+def _read_csv_pyarrow(path: str,
+                      sep: str = "\t",
+                      header: str = None,
+                      dtype: dict = None):
+    """ Parse a CSV file with pyarrow's (multithreaded) reader, and return
+        the same object array as `pd.read_csv(...).values` would """
+    tbl = pacsv.read_csv(
+        path,
+        read_options=pacsv.ReadOptions(
+            autogenerate_column_names=header is None),
+        parse_options=pacsv.ParseOptions(
+            delimiter=sep, newlines_in_values=True),
+        convert_options=pacsv.ConvertOptions(
+            column_types=dtype, strings_can_be_null=True))
+    # fill columns directly, i.e. skip building a DataFrame first
+    data = np.empty((tbl.num_rows, tbl.num_columns), dtype=object)
+    for j, col in enumerate(tbl.columns):
+        data[:, j] = col.to_numpy()
+    # missing values are None in arrow, but NaN in pandas
+    data[pd.isnull(data)] = np.nan
+    return data
+
+
+def _file_key(path: str):
+    """ Absolute path, modification time and size of a file, i.e. a cache
+        key that changes if the working directory or the file changes """
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    return path, stat.st_mtime_ns, stat.st_size
+
+
+def _load_tsv(path: str,
+              sep: str = "\t",
+              header: str = None,
+              text_col: int = None):
+    """ Read a (small) TSV/CSV file once, and serve repeated loads from cache
+
+    Notes:
+    ------
+    The cache is invalidated if the file is modified.
+    The returned array is shared between calls and flagged read-only.
+    Call `.copy()` before modifying it inplace.
+    pyarrow is used for parsing if installed, otherwise pandas. pandas
+    is also the fallback for files pyarrow rejects, e.g. rows with less
+    fields, which pandas pads with NaN.
+    The column `text_col` is read as string without type inference.
+    """
+    return _load_tsv_cached(
+        *_file_key(path), sep=sep, header=header, text_col=text_col)
+
+
+@functools.lru_cache(maxsize=16)
+def _load_tsv_cached(path: str,
+                     mtime_ns: int,
+                     size: int,
+                     sep: str = "\t",
+                     header: str = None,
+                     text_col: int = None):
+    # column name of the texts
+    if text_col is None or header is None:
+        name = text_col
+    else:
+        name = pd.read_csv(path, sep=sep, nrows=0).columns[text_col]
+
+    data = None
+    if pacsv is not None:
+        try:
+            data = _read_csv_pyarrow(
+                path, sep=sep, header=header,
+                dtype=None if name is None else {
+                    f"f{name}" if header is None else name: "string"})
+        except pyarrow.lib.ArrowInvalid:
+            pass
+    if data is None:
+        data = pd.read_csv(
+            path, sep=sep, header=header,
+            dtype=None if name is None else {name: str}).values
+    data.setflags(write=False)
+    return data
+
+
+def _load_germeval17(path: str):
+    return _load_germeval17_cached(*_file_key(path))
+
+
+@functools.lru_cache(maxsize=4)
+def _load_germeval17_cached(path: str, mtime_ns: int, size: int):
+    # strip the category suffix once per file, e.g. 'Allgemein:negative'
+    data = _load_tsv(path, sep="\t", header=None, text_col=1).copy()
+    # split the unique values only, and map back via categorical codes
+    cat = pd.Categorical(pd.Series(data[:, 4]).astype(str))
+    prefixes = cat.categories.str.split(":", n=1).str[0].to_numpy()
+    data[:, 4] = prefixes[cat.codes]
+    data.setflags(write=False)
+    return data
+
+
+def _preprocess(preprocesser,
+                texts: List[str],
+                chunksize: int = 4096,
+                dtype: torch.dtype = torch.float32,
+                cachefolder: str = None,
+                cachekey: str = None):
+    """ Call `preprocesser` chunk by chunk, and copy the features into one
+        preallocated tensor, i.e. only one chunk of `preprocesser` outputs
+        is held in memory at any time
+
+    Notes:
+    ------
+    Duplicate texts are passed to `preprocesser` only once.
+
+    Floating point features are stored as `dtype`, and upcasted to
+    float32 when retrieved from the dataset. Use `dtype=torch.float16`
+    to halve the memory footprint, at the cost of precision.
+
+    If `cachefolder` is given, the features are saved as .npy file, and
+    memory-mapped on the next call with the same texts and `cachekey`.
+    The `cachekey` must identify your `preprocesser` (e.g. the model
+    name), and must be changed whenever the `preprocesser` changes.
+    """
+    if cachefolder is not None:
+        if not cachekey:
+            raise ValueError(
+                "cachekey is required, e.g. the name of the model")
+        key = hashlib.sha1(repr((cachekey, str(dtype))).encode())
+        for text in texts:
+            key.update(text.encode() + b"\0")
+        fname = os.path.join(cachefolder, f"{key.hexdigest()}.npy")
+        if os.path.isfile(fname):
+            return torch.from_numpy(np.load(fname, mmap_mode="c"))
+
+    # preprocess each distinct text only once
+    lookup = {}
+    inverse = [lookup.setdefault(text, len(lookup)) for text in texts]
+    unique = list(lookup)
+
+    # torch<1.9 has no inference mode
+    no_grad = getattr(torch, "inference_mode", torch.no_grad)
+    X = None
+    # at least one call, i.e. `preprocesser([])` sets the shape if empty
+    for i in range(0, max(len(unique), 1), chunksize):
+        # no autograd graph; X itself is created outside, a normal tensor
+        with no_grad():
+            features = preprocesser(unique[i:i + chunksize])
+        if not isinstance(features, torch.Tensor):
+            features = torch.tensor(features)
+        if X is None:
+            X = torch.empty(
+                (len(unique), *features.shape[1:]),
+                dtype=dtype if features.is_floating_point()
+                else features.dtype)
+        if X.dtype == torch.float16 and features.numel() > 0 and (
+                features.abs().max() > torch.finfo(torch.float16).max):
+            raise ValueError(
+                "features exceed the float16 range, use dtype=torch.float32")
+        X[i:i + chunksize] = features
+    # copy the features back to the duplicates
+    if len(unique) < len(texts):
+        X = X[torch.tensor(inverse)]
+
+    if cachefolder is not None:
+        # write to a temporary file first, i.e. no truncated cache files
+        os.makedirs(cachefolder, exist_ok=True)
+        fd, tmpname = tempfile.mkstemp(dir=cachefolder, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fp:
+                np.save(fp, X.numpy())
+            os.replace(tmpname, fname)
+        except BaseException:
+            os.remove(tmpname)
+            raise
+    return X
+
+
+def _encode_labels(values: np.ndarray, labels: list):
+    """ Convert a column of label values to class indices (i.e. the
+        position in `labels`) with pandas' categorical codes """
+    codes = pd.Categorical(values, categories=labels).codes
+    if (codes < 0).any():
+        unknown = set(values[codes < 0]) - set(labels)
+        raise ValueError(f"unknown labels: {unknown}")
+    return torch.from_numpy(codes.astype(np.int64))
 
 
 def get_data_split(n: int,
                    split_ratio: float = 0.2,
                    random_seed: int = 42):
-    # set seed for reproducibility
-    if random_seed:
-        torch.manual_seed(random_seed)
+    # local generator, i.e. torch's global seed remains untouched
+    rng = np.random.default_rng(random_seed if random_seed else None)
     # random indicies
-    idx = torch.randperm(n)
+    idx = torch.from_numpy(rng.permutation(n))
     n_valid = int(n * split_ratio)
     idx_valid = idx[:n_valid]
     idx_train = idx[n_valid:]
@@ -22,17 +215,53 @@ def get_data_split(n: int,
 
 
 class BaseDataset(torch.utils.data.Dataset):
+    """ Base class of all datasets
+
+    Notes:
+    ------
+    The features are preprocessed once, and kept in memory as tensor.
+    Use the DataLoader with `num_workers=0` (default) and
+    `pin_memory=True` on GPU. Worker processes would only add IPC
+    overhead, i.e. each batch is pickled and sent to the main process.
+
+    Whole batches can be fetched with one indexing operation each, if the
+    DataLoader gets a BatchSampler and `batch_size=None`, e.g.
+    dgen = torch.utils.data.DataLoader(
+        dset, batch_size=None, sampler=torch.utils.data.BatchSampler(
+            torch.utils.data.RandomSampler(dset), 64, False))
+    """
     def __init__(self):
         pass
 
+    def _prepare_data_split(self,
+                            early_stopping: bool,
+                            split_ratio: float,
+                            random_seed: int):
+        if early_stopping:
+            self.indices, self.idx_valid = get_data_split(
+                self.X.shape[0], split_ratio=split_ratio,
+                random_seed=random_seed)
+            # gather the rows once, so that __getitem__ doesn't index twice
+            self.X_valid = self.X[self.idx_valid]
+            self.y_valid = self.y[self.idx_valid]
+            self.X = self.X[self.indices]
+            self.y = self.y[self.indices]
+        else:
+            # all rows in original order, nothing to gather
+            self.indices, self.idx_valid = None, None
+            self.X_valid, self.y_valid = None, None
+
     def get_validation_set(self):
-        if self.idx_valid is not None:
-            return self.X[self.idx_valid], self.y[self.idx_valid]
+        if self.X_valid is not None:
+            return self.X_valid.float(), self.y_valid
         else:
             return None, None
 
     def get_class_weights(self):
-        cnts = torch.bincount(self.y)
+        # count all rows, i.e. incl. the validation rows
+        y = self.y if self.y_valid is None else torch.cat(
+            [self.y, self.y_valid])
+        cnts = torch.bincount(y)
         cnts = torch.maximum(cnts, torch.tensor(1))
         weights = cnts.sum() / (len(cnts) * cnts)
         return weights
@@ -44,10 +273,11 @@ class BaseDataset(torch.utils.data.Dataset):
         return self.X.shape[-1]
 
     def __len__(self):
-        return len(self.indices)
+        return len(self.y)
 
     def __getitem__(self, rowidx):
-        return self.X[self.indices[rowidx]], self.y[self.indices[rowidx]]
+        # `rowidx` can be a list of indices too, i.e. a whole batch
+        return self.X[rowidx].float(), self.y[rowidx]
 
     def __str__(self):
         return (
@@ -56,7 +286,60 @@ class BaseDataset(torch.utils.data.Dataset):
         )
 
 
-class GermEval17(BaseDataset):
+class _GermEvalBase(BaseDataset):
+    """ Shared steps of the GermEval datasets, i.e. remove bad rows,
+        preprocess the text column, encode the labels, and split the data
+
+    Parameters:
+    -----------
+    data : np.ndarray
+        The rows as read by `_load_tsv`
+    text_col, label_col : int
+        Column index of the texts, and of the labels
+    labels : list
+        Label values in class index order. If None, the label column
+        already contains the class indices.
+    bad_row_filter : Callable
+        Returns a boolean mask of the rows to keep, given `data`
+    """
+    def __init__(self,
+                 preprocesser,
+                 data: np.ndarray,
+                 text_col: int,
+                 label_col: int,
+                 labels: list = None,
+                 bad_row_filter: Callable = None,
+                 test: bool = False,
+                 early_stopping: bool = False,
+                 split_ratio: float = 0.2,
+                 random_seed: int = 42,
+                 cachefolder: str = None,
+                 cachekey: str = None,
+                 dtype: torch.dtype = torch.float32):
+        self.colidx = label_col
+        self.labels = labels
+
+        # bad examples to be removed
+        if bad_row_filter is not None:
+            data = data[bad_row_filter(data)]
+
+        # preprocess
+        self.X = _preprocess(
+            preprocesser, data[:, text_col].astype(str).tolist(),
+            cachefolder=cachefolder, cachekey=cachekey, dtype=dtype)
+        if self.labels is None:
+            self.y = torch.from_numpy(
+                data[:, self.colidx].astype(np.int64))
+        else:
+            self.y = _encode_labels(data[:, self.colidx], self.labels)
+
+        # prepare data split
+        self._prepare_data_split(
+            early_stopping and (not test), split_ratio=split_ratio,
+            random_seed=random_seed)
+
+
+class GermEval17(_GermEvalBase):
     """ ABSD-Relevance, -Sentiment, -Category
     Examples:
     ---------
@@ -66,7 +349,7 @@ class GermEval17(BaseDataset):
     X_valid, y_valid = dset.get_validation_set()
     n_classes = dset.num_classes()
     dgen = torch.utils.data.DataLoader(
-        dset, **{'batch_size': 64, 'shuffle': True, 'num_workers': 6})
+        dset, **{'batch_size': 64, 'shuffle': True, 'pin_memory': True})
     for X, y in dgen: break
     """
     def __init__(self,
@@ -76,17 +359,19 @@ class GermEval17(BaseDataset):
                  test: bool = False,
                  early_stopping: bool = False,
                  split_ratio: float = 0.2,
-                 random_seed: int = 42):
+                 random_seed: int = 42,
+                 cachefolder: str = None,
+                 cachekey: str = None,
+                 dtype: torch.dtype = torch.float32):
         assert task in ["Relevance", "Sentiment", "Category"]
-        self.colidx = int(
-            ["Relevance", "Sentiment", "Category"].index(task) + 2)
+        colidx = int(["Relevance", "Sentiment", "Category"].index(task) + 2)
 
         if task == "Relevance":
-            self.labels = [False, True]
+            labels = [False, True]
         elif task == "Sentiment":
-            self.labels = ['negative', 'neutral', 'positive']
+            labels = ['negative', 'neutral', 'positive']
         elif task == "Category":
-            self.labels = [
+            labels = [
                 'Image', 'Informationen', 'Connectivity',
                 'Auslastung_und_Platzangebot', 'Service_und_Kundenbetreuung',
                 'Gastronomisches_Angebot', 'Allgemein', 'Design',
@@ -97,31 +382,17 @@ class GermEval17(BaseDataset):
 
         # read data
         split = "test" if test else "train"
-        data = pd.read_csv(
-            f"{datafolder}/germeval17/{split}.tsv",
-            sep="\t", header=None).values
-        data[:, 4] = [str(s).split(":")[0] for s in data[:, 4]]
-        # bad examples to be removed
-        idxbad = [i for i, x in enumerate(data[:, 1])
-                  if not isinstance(x, str)]
-        data = np.delete(data, idxbad, axis=0)
-
-        # preprocess
-        self.X = preprocesser(data[:, 1].astype(str).tolist())
-        if not isinstance(self.X, torch.Tensor):
-            self.X = torch.tensor(self.X)
-        self.y = torch.tensor(
-            [self.labels.index(row[self.colidx]) for row in data])
-        # prepare data split
-        if early_stopping and split == "train":
-            self.indices, self.idx_valid = get_data_split(
-                self.X.shape[0], random_seed=random_seed)
-        else:
-            self.indices = torch.tensor(range(self.X.shape[0]))
-            self.idx_valid = None
+        data = _load_germeval17(f"{datafolder}/germeval17/{split}.tsv")
+        super(GermEval17, self).__init__(
+            preprocesser, data, text_col=1, label_col=colidx, labels=labels,
+            # bad examples to be removed, i.e. missing texts
+            bad_row_filter=lambda data: pd.notna(data[:, 1]),
+            test=test, early_stopping=early_stopping, split_ratio=split_ratio,
+            random_seed=random_seed, cachefolder=cachefolder,
+            cachekey=cachekey, dtype=dtype)
 
 
-class GermEval18(BaseDataset):
+class GermEval18(_GermEvalBase):
     """ OL18A, OL18B
     Examples:
     ---------
@@ -131,7 +402,7 @@ class GermEval18(BaseDataset):
     X_valid, y_valid = dset.get_validation_set()
     n_classes = dset.num_classes()
     dgen = torch.utils.data.DataLoader(
-        dset, **{'batch_size': 64, 'shuffle': True, 'num_workers': 6})
+        dset, **{'batch_size': 64, 'shuffle': True, 'pin_memory': True})
     for X, y in dgen: break
     """
     def __init__(self,
@@ -141,37 +412,31 @@ class GermEval18(BaseDataset):
                  test: bool = False,
                  early_stopping: bool = False,
                  split_ratio: float = 0.2,
-                 random_seed: int = 42):
+                 random_seed: int = 42,
+                 cachefolder: str = None,
+                 cachekey: str = None,
+                 dtype: torch.dtype = torch.float32):
         assert task in ["A", "B", "C"]
-        self.colidx = int(["A", "B", "C"].index(task) + 1)
+        colidx = int(["A", "B", "C"].index(task) + 1)
 
         if task == "A":
-            self.labels = ['OFFENSE', 'OTHER']
+            labels = ['OFFENSE', 'OTHER']
         elif task == "B":
-            self.labels = ['PROFANITY', 'INSULT', 'ABUSE', 'OTHER']
+            labels = ['PROFANITY', 'INSULT', 'ABUSE', 'OTHER']
 
         # read data
         split = "test" if test else "train"
-        data = pd.read_csv(
+        data = _load_tsv(
             f"{datafolder}/germeval18/{split}.txt",
-            sep="\t", header=None).values
-        # preprocess
-        self.X = preprocesser(data[:, 0].astype(str).tolist())
-        if not isinstance(self.X, torch.Tensor):
-            self.X = torch.tensor(self.X)
-        self.y = torch.tensor(
-            [self.labels.index(row[self.colidx]) for row in data])
+            sep="\t", header=None, text_col=0)
+        super(GermEval18, self).__init__(
+            preprocesser, data, text_col=0, label_col=colidx, labels=labels,
+            test=test, early_stopping=early_stopping, split_ratio=split_ratio,
+            random_seed=random_seed, cachefolder=cachefolder,
+            cachekey=cachekey, dtype=dtype)
 
-        # prepare data split
-        if early_stopping and split == "train":
-            self.indices, self.idx_valid = get_data_split(
-                self.X.shape[0], random_seed=random_seed)
-        else:
-            self.indices = torch.tensor(range(self.X.shape[0]))
-            self.idx_valid = None
 
-
-class GermEval19(BaseDataset):
+class GermEval19(_GermEvalBase):
     """ OL19A, OL19B, OL19C
     Examples:
     ---------
@@ -181,7 +446,7 @@ class GermEval19(BaseDataset):
     X_valid, y_valid = dset.get_validation_set()
     n_classes = dset.num_classes()
     dgen = torch.utils.data.DataLoader(
-        dset, **{'batch_size': 64, 'shuffle': True, 'num_workers': 6})
+        dset, **{'batch_size': 64, 'shuffle': True, 'pin_memory': True})
     for X, y in dgen: break
     """
     def __init__(self,
@@ -191,42 +456,36 @@ class GermEval19(BaseDataset):
                  test: bool = False,
                  early_stopping: bool = False,
                  split_ratio: float = 0.2,
-                 random_seed: int = 42):
+                 random_seed: int = 42,
+                 cachefolder: str = None,
+                 cachekey: str = None,
+                 dtype: torch.dtype = torch.float32):
         assert task in ["A", "B", "C"]
-        self.colidx = int(["A", "B", "C"].index(task) + 1)
+        colidx = int(["A", "B", "C"].index(task) + 1)
 
         if task == "A":
-            self.labels = ['OFFENSE', 'OTHER']
+            labels = ['OFFENSE', 'OTHER']
             fsuf = "12"
         elif task == "B":
-            self.labels = ['PROFANITY', 'INSULT', 'ABUSE', 'OTHER']
+            labels = ['PROFANITY', 'INSULT', 'ABUSE', 'OTHER']
             fsuf = "12"
         elif task == "C":
-            self.labels = ['EXPLICIT', 'IMPLICIT']
+            labels = ['EXPLICIT', 'IMPLICIT']
             fsuf = "3"
 
         # read data
         split = "gold" if test else "train"
-        data = pd.read_csv(
+        data = _load_tsv(
             f"{datafolder}/germeval19/{split}{fsuf}.txt",
-            sep="\t", header=None).values
-        # preprocess
-        self.X = preprocesser(data[:, 0].astype(str).tolist())
-        if not isinstance(self.X, torch.Tensor):
-            self.X = torch.tensor(self.X)
-        self.y = torch.tensor(
-            [self.labels.index(row[self.colidx]) for row in data])
-
-        # prepare data split
-        if early_stopping and split == "train":
-            self.indices, self.idx_valid = get_data_split(
-                self.X.shape[0], random_seed=random_seed)
-        else:
-            self.indices = torch.tensor(range(self.X.shape[0]))
-            self.idx_valid = None
+            sep="\t", header=None, text_col=0)
+        super(GermEval19, self).__init__(
+            preprocesser, data, text_col=0, label_col=colidx, labels=labels,
+            test=test, early_stopping=early_stopping, split_ratio=split_ratio,
+            random_seed=random_seed, cachefolder=cachefolder,
+            cachekey=cachekey, dtype=dtype)
 
 
-class GermEval21(BaseDataset):
+class GermEval21(_GermEvalBase):
     """ TOXIC, ENGAGE FCLAIM
     Examples:
     ---------
@@ -236,7 +495,7 @@ class GermEval21(BaseDataset):
     X_valid, y_valid = dset.get_validation_set()
     n_classes = dset.num_classes()
     dgen = torch.utils.data.DataLoader(
-        dset, **{'batch_size': 64, 'shuffle': True, 'num_workers': 6})
+        dset, **{'batch_size': 64, 'shuffle': True, 'pin_memory': True})
     for X, y in dgen: break
     """
     def __init__(self,
@@ -246,32 +505,30 @@ class GermEval21(BaseDataset):
                  test: bool = False,
                  early_stopping: bool = False,
                  split_ratio: float = 0.2,
-                 random_seed: int = 42):
+                 random_seed: int = 42,
+                 cachefolder: str = None,
+                 cachekey: str = None,
+                 dtype: torch.dtype = torch.float32):
         assert task in ["TOXIC", "ENGAGE", "FCLAIM"]
-        self.colidx = int(["TOXIC", "ENGAGE", "FCLAIM"].index(task) + 2)
+        colidx = int(["TOXIC", "ENGAGE", "FCLAIM"].index(task) + 2)
 
         # read data
         split = "test" if test else "train"
-        data = pd.read_csv(f"{datafolder}/germeval21/{split}.csv").values
-        # preprocess
-        self.X = preprocesser(data[:, 1].astype(str).tolist())
-        if not isinstance(self.X, torch.Tensor):
-            self.X = torch.tensor(self.X)
-        self.y = torch.tensor([row[self.colidx] for row in data])
-
-        # prepare data split
-        if early_stopping and split == "train":
-            self.indices, self.idx_valid = get_data_split(
-                self.X.shape[0], random_seed=random_seed)
-        else:
-            self.indices = torch.tensor(range(self.X.shape[0]))
-            self.idx_valid = None
+        data = _load_tsv(
+            f"{datafolder}/germeval21/{split}.csv",
+            sep=",", header="infer", text_col=1)
+        # the label columns are 0/1 already
+        super(GermEval21, self).__init__(
+            preprocesser, data, text_col=1, label_col=colidx, labels=None,
+            test=test, early_stopping=early_stopping, split_ratio=split_ratio,
+            random_seed=random_seed, cachefolder=cachefolder,
+            cachekey=cachekey, dtype=dtype)
 
     def num_classes(self):
         return 2
 
 
-class GermEval21vmwe(BaseDataset):
+class GermEval21vmwe(_GermEvalBase):
     """ VMWE
     Examples:
     ---------
@@ -281,7 +538,7 @@ class GermEval21vmwe(BaseDataset):
     X_valid, y_valid = dset.get_validation_set()
     n_classes = dset.num_classes()
     dgen = torch.utils.data.DataLoader(
-        dset, **{'batch_size': 64, 'shuffle': True, 'num_workers': 6})
+        dset, **{'batch_size': 64, 'shuffle': True, 'pin_memory': True})
     for X, y in dgen: break
     """
     def __init__(self,
@@ -290,33 +547,26 @@ class GermEval21vmwe(BaseDataset):
                  test: bool = False,
                  early_stopping: bool = False,
                  split_ratio: float = 0.2,
-                 random_seed: int = 42):
-        # self.labels = ['figuratively', 'literally', 'both', 'undecidable']
-        self.labels = ['figuratively', 'literally']
+                 random_seed: int = 42,
+                 cachefolder: str = None,
+                 cachekey: str = None,
+                 dtype: torch.dtype = torch.float32):
+        # labels = ['figuratively', 'literally', 'both', 'undecidable']
+        labels = ['figuratively', 'literally']
 
         # read data
         split = "test" if test else "train"
-        data = pd.read_csv(
+        data = _load_tsv(
             f"{datafolder}/germeval21vmwe/{split}.tsv",
-            sep="\t", header=None).values
-        # bad examples to be removed
-        idxbad = [i for i, x in enumerate(data[:, 2])
-                  if x not in self.labels]
-        data = np.delete(data, idxbad, axis=0)
-
-        # preprocess
-        self.X = preprocesser(data[:, 3].astype(str).tolist())
-        if not isinstance(self.X, torch.Tensor):
-            self.X = torch.tensor(self.X)
-        self.y = torch.tensor([self.labels.index(row[2]) for row in data])
-
-        # prepare data split
-        if early_stopping and split == "train":
-            self.indices, self.idx_valid = get_data_split(
-                self.X.shape[0], random_seed=random_seed)
-        else:
-            self.indices = torch.tensor(range(self.X.shape[0]))
-            self.idx_valid = None
+            sep="\t", header=None, text_col=3)
+        super(GermEval21vmwe, self).__init__(
+            preprocesser, data, text_col=3, label_col=2, labels=labels,
+            # bad examples to be removed
+            bad_row_filter=lambda data: np.isin(
+                data[:, 2].astype(str), labels),
+            test=test, early_stopping=early_stopping, split_ratio=split_ratio,
+            random_seed=random_seed, cachefolder=cachefolder,
+            cachekey=cachekey, dtype=dtype)
 
     def num_classes(self):
         return 2
@@ -342,7 +592,7 @@ class MillionSentiment(BaseDataset):
     X_valid, y_valid = dset.get_validation_set()
     n_classes = dset.num_classes()
     dgen = torch.utils.data.DataLoader(
-        dset, **{'batch_size': 64, 'shuffle': True, 'num_workers': 6})
+        dset, **{'batch_size': 64, 'shuffle': True, 'pin_memory': True})
     for X, y in dgen: break
     """
     def __init__(self,
@@ -351,7 +601,10 @@ class MillionSentiment(BaseDataset):
                  test: bool = False,
                  early_stopping: bool = False,
                  split_ratio: float = 0.2,
-                 random_seed: int = 42):
+                 random_seed: int = 42,
+                 cachefolder: str = None,
+                 cachekey: str = None,
+                 dtype: torch.dtype = torch.float32):
         # self.labels = ['negative', 'neural', 'positive']
         # read data
         con = sqlite3.connect(f"{datafolder}/1mio/corpus.sqlite3")
@@ -384,18 +637,15 @@ class MillionSentiment(BaseDataset):
                 X, y, test_size=0.5, random_state=random_seed, stratify=y)
 
         # preprocess
-        self.X = preprocesser(X)
-        if not isinstance(self.X, torch.Tensor):
-            self.X = torch.tensor(self.X)
+        self.X = _preprocess(
+            preprocesser, X,
+            cachefolder=cachefolder, cachekey=cachekey, dtype=dtype)
         self.y = torch.tensor(y)
 
         # prepare data split
-        if early_stopping and (not test):
-            self.indices, self.idx_valid = get_data_split(
-                self.X.shape[0], random_seed=random_seed)
-        else:
-            self.indices = torch.tensor(range(self.X.shape[0]))
-            self.idx_valid = None
+        self._prepare_data_split(
+            early_stopping and (not test), split_ratio=split_ratio,
+            random_seed=random_seed)
 
     def num_classes(self):
         return 3
@@ -420,7 +670,7 @@ class MillionBinary(BaseDataset):
     X_valid, y_valid = dset.get_validation_set()
     n_classes = dset.num_classes()
     dgen = torch.utils.data.DataLoader(
-        dset, **{'batch_size': 64, 'shuffle': True, 'num_workers': 6})
+        dset, **{'batch_size': 64, 'shuffle': True, 'pin_memory': True})
     for X, y in dgen: break
     """
     def __init__(self,
@@ -430,7 +680,10 @@ class MillionBinary(BaseDataset):
                  test: bool = False,
                  early_stopping: bool = False,
                  split_ratio: float = 0.2,
-                 random_seed: int = 42):
+                 random_seed: int = 42,
+                 cachefolder: str = None,
+                 cachekey: str = None,
+                 dtype: torch.dtype = torch.float32):
         # self.labels = ['negative', 'neural', 'positive']
         # task
         t1 = ['MIO-O', 'MIO-I', 'MIO-D', 'MIO-F', 'MIO-P', 'MIO-A']
@@ -469,18 +722,15 @@ class MillionBinary(BaseDataset):
                 X, y, test_size=0.5, random_state=random_seed, stratify=y)
 
         # preprocess
-        self.X = preprocesser(X)
-        if not isinstance(self.X, torch.Tensor):
-            self.X = torch.tensor(self.X)
+        self.X = _preprocess(
+            preprocesser, X,
+            cachefolder=cachefolder, cachekey=cachekey, dtype=dtype)
         self.y = torch.tensor(y)
 
         # prepare data split
-        if early_stopping and (not test):
-            self.indices, self.idx_valid = get_data_split(
-                self.X.shape[0], random_seed=random_seed)
-        else:
-            self.indices = torch.tensor(range(self.X.shape[0]))
-            self.idx_valid = None
+        self._prepare_data_split(
+            early_stopping and (not test), split_ratio=split_ratio,
+            random_seed=random_seed)
 
     def num_classes(self):
         return 2
@@ -496,7 +746,7 @@ class SBCHisSwiss(BaseDataset):
     X_valid, y_valid = dset.get_validation_set()
     n_classes = dset.num_classes()
     dgen = torch.utils.data.DataLoader(
-        dset, **{'batch_size': 64, 'shuffle': True, 'num_workers': 6})
+        dset, **{'batch_size': 64, 'shuffle': True, 'pin_memory': True})
     for X, y in dgen: break
     """
     def __init__(self,
@@ -505,7 +755,10 @@ class SBCHisSwiss(BaseDataset):
                  test: bool = False,
                  early_stopping: bool = False,
                  split_ratio: float = 0.2,
-                 random_seed: int = 42):
+                 random_seed: int = 42,
+                 cachefolder: str = None,
+                 cachekey: str = None,
+                 dtype: torch.dtype = torch.float32):
         # read data
         df1 = pd.read_csv(f"{datafolder}/sbch/sentiment.csv")
         df2 = pd.read_csv(f"{datafolder}/sbch/chatmania.csv")
@@ -524,18 +777,15 @@ class SBCHisSwiss(BaseDataset):
                 X, y, test_size=0.5, random_state=random_seed, stratify=y)
 
         # preprocess
-        self.X = preprocesser(X)
-        if not isinstance(self.X, torch.Tensor):
-            self.X = torch.tensor(self.X)
+        self.X = _preprocess(
+            preprocesser, X,
+            cachefolder=cachefolder, cachekey=cachekey, dtype=dtype)
         self.y = torch.tensor(y)
 
         # prepare data split
-        if early_stopping and (not test):
-            self.indices, self.idx_valid = get_data_split(
-                self.X.shape[0], random_seed=random_seed)
-        else:
-            self.indices = torch.tensor(range(self.X.shape[0]))
-            self.idx_valid = None
+        self._prepare_data_split(
+            early_stopping and (not test), split_ratio=split_ratio,
+            random_seed=random_seed)
 
     def num_classes(self):
         return 2
@@ -551,7 +801,7 @@ class SBCHsenti(BaseDataset):
     X_valid, y_valid = dset.get_validation_set()
     n_classes = dset.num_classes()
     dgen = torch.utils.data.DataLoader(
-        dset, **{'batch_size': 64, 'shuffle': True, 'num_workers': 6})
+        dset, **{'batch_size': 64, 'shuffle': True, 'pin_memory': True})
     for X, y in dgen: break
     """
     def __init__(self,
@@ -560,7 +810,10 @@ class SBCHsenti(BaseDataset):
                  test: bool = False,
                  early_stopping: bool = False,
                  split_ratio: float = 0.2,
-                 random_seed: int = 42):
+                 random_seed: int = 42,
+                 cachefolder: str = None,
+                 cachekey: str = None,
+                 dtype: torch.dtype = torch.float32):
         # read data
         df1 = pd.read_csv(f"{datafolder}/sbch/sentiment.csv")
         df2 = pd.read_csv(f"{datafolder}/sbch/chatmania.csv")
@@ -587,18 +840,15 @@ class SBCHsenti(BaseDataset):
                 X, y, test_size=0.5, random_state=random_seed, stratify=y)
 
         # preprocess
-        self.X = preprocesser(X)
-        if not isinstance(self.X, torch.Tensor):
-            self.X = torch.tensor(self.X)
+        self.X = _preprocess(
+            preprocesser, X,
+            cachefolder=cachefolder, cachekey=cachekey, dtype=dtype)
         self.y = torch.tensor(y)
 
         # prepare data split
-        if early_stopping and (not test):
-            self.indices, self.idx_valid = get_data_split(
-                self.X.shape[0], random_seed=random_seed)
-        else:
-            self.indices = torch.tensor(range(self.X.shape[0]))
-            self.idx_valid = None
+        self._prepare_data_split(
+            early_stopping and (not test), split_ratio=split_ratio,
+            random_seed=random_seed)
 
     def num_classes(self):
         return 3
@@ -620,7 +870,7 @@ class LSDC(BaseDataset):
     X_valid, y_valid = dset.get_validation_set()
     n_classes = dset.num_classes()
     dgen = torch.utils.data.DataLoader(
-        dset, **{'batch_size': 64, 'shuffle': True, 'num_workers': 6})
+        dset, **{'batch_size': 64, 'shuffle': True, 'pin_memory': True})
     for X, y in dgen: break
     """
     def __init__(self,
@@ -629,7 +879,10 @@ class LSDC(BaseDataset):
                  test: bool = False,
                  early_stopping: bool = False,
                  split_ratio: float = 0.2,
-                 random_seed: int = 42):
+                 random_seed: int = 42,
+                 cachefolder: str = None,
+                 cachekey: str = None,
+                 dtype: torch.dtype = torch.float32):
         # excluded: 'NPR' (extinct dialect), 'GRO' (lack of data)
         self.labels = ['ACH', 'DRE', 'HAM', 'HOL', 'MAR', 'MKB', 'MON',
                        'NNI', 'OFL', 'OFR', 'OVY', 'OWL', 'SUD', 'TWE']
@@ -640,23 +893,18 @@ class LSDC(BaseDataset):
             sep="\t", header=None).values
 
         # bad examples to be removed
-        idxbad = [i for i, x in enumerate(data[:, 0])
-                  if x not in self.labels]
-        data = np.delete(data, idxbad, axis=0)
+        mask = np.isin(data[:, 0].astype(str), self.labels)
+        data = data[mask]
 
         # preprocess
-        self.X = preprocesser(data[:, 2].astype(str).tolist())
-        if not isinstance(self.X, torch.Tensor):
-            self.X = torch.tensor(self.X)
-        self.y = torch.tensor(
-            [self.labels.index(row[0]) for row in data])
+        self.X = _preprocess(
+            preprocesser, data[:, 2].astype(str).tolist(),
+            cachefolder=cachefolder, cachekey=cachekey, dtype=dtype)
+        self.y = _encode_labels(data[:, 0], self.labels)
         # prepare data split
-        if early_stopping and split == "train":
-            self.indices, self.idx_valid = get_data_split(
-                self.X.shape[0], random_seed=random_seed)
-        else:
-            self.indices = torch.tensor(range(self.X.shape[0]))
-            self.idx_valid = None
+        self._prepare_data_split(
+            early_stopping and split == "train", split_ratio=split_ratio,
+            random_seed=random_seed)
 
 
 class ArchiMob(BaseDataset):
@@ -669,7 +917,7 @@ class ArchiMob(BaseDataset):
     X_valid, y_valid = dset.get_validation_set()
     n_classes = dset.num_classes()
     dgen = torch.utils.data.DataLoader(
-        dset, **{'batch_size': 64, 'shuffle': True, 'num_workers': 6})
+        dset, **{'batch_size': 64, 'shuffle': True, 'pin_memory': True})
     for X, y in dgen: break
     """
     def __init__(self,
@@ -678,7 +926,10 @@ class ArchiMob(BaseDataset):
                  test: bool = False,
                  early_stopping: bool = False,
                  split_ratio: float = 0.2,
-                 random_seed: int = 42):
+                 random_seed: int = 42,
+                 cachefolder: str = None,
+                 cachekey: str = None,
+                 dtype: torch.dtype = torch.float32):
         self.labels = ['BE', 'BS', 'ZH', 'LU']
         # read data
         if test:
@@ -695,19 +946,15 @@ class ArchiMob(BaseDataset):
             data = np.vstack([data1, data2])
 
         # preprocess
-        self.X = preprocesser(data[:, 0].astype(str).tolist())
-        if not isinstance(self.X, torch.Tensor):
-            self.X = torch.tensor(self.X)
-        self.y = torch.tensor(
-            [self.labels.index(row[1]) for row in data])
+        self.X = _preprocess(
+            preprocesser, data[:, 0].astype(str).tolist(),
+            cachefolder=cachefolder, cachekey=cachekey, dtype=dtype)
+        self.y = _encode_labels(data[:, 1], self.labels)
 
         # prepare data split
-        if early_stopping and (not test):
-            self.indices, self.idx_valid = get_data_split(
-                self.X.shape[0], random_seed=random_seed)
-        else:
-            self.indices = torch.tensor(range(self.X.shape[0]))
-            self.idx_valid = None
+        self._prepare_data_split(
+            early_stopping and (not test), split_ratio=split_ratio,
+            random_seed=random_seed)
 
 
 class KLEX(BaseDataset):
@@ -721,7 +968,7 @@ class KLEX(BaseDataset):
     X_valid, y_valid = dset.get_validation_set()
     n_classes = dset.num_classes()
     dgen = torch.utils.data.DataLoader(
-        dset, **{'batch_size': 64, 'shuffle': True, 'num_workers': 6})
+        dset, **{'batch_size': 64, 'shuffle': True, 'pin_memory': True})
     for X, y in dgen: break
     """
     def __init__(self,
@@ -730,7 +977,10 @@ class KLEX(BaseDataset):
                  test: bool = False,
                  early_stopping: bool = False,
                  split_ratio: float = 0.2,
-                 random_seed: int = 42):
+                 random_seed: int = 42,
+                 cachefolder: str = None,
+                 cachekey: str = None,
+                 dtype: torch.dtype = torch.float32):
         # read data
         dat0 = json.load(open(f"{datafolder}/klexikon/beginner.json", "r"))
         dat1 = json.load(open(f"{datafolder}/klexikon/children.json", "r"))
@@ -759,18 +1009,15 @@ class KLEX(BaseDataset):
         y = [0] * len(x0) + [1] * len(x1) + [2] * len(x2)
 
         # preprocess
-        self.X = preprocesser(X)
-        if not isinstance(self.X, torch.Tensor):
-            self.X = torch.tensor(self.X)
+        self.X = _preprocess(
+            preprocesser, X,
+            cachefolder=cachefolder, cachekey=cachekey, dtype=dtype)
         self.y = torch.tensor(y)
 
         # prepare data split
-        if early_stopping and (not test):
-            self.indices, self.idx_valid = get_data_split(
-                self.X.shape[0], random_seed=random_seed)
-        else:
-            self.indices = torch.tensor(range(self.X.shape[0]))
-            self.idx_valid = None
+        self._prepare_data_split(
+            early_stopping and (not test), split_ratio=split_ratio,
+            random_seed=random_seed)
 
     def num_classes(self):
         return 3
@@ -41,6 +41,18 @@ def build_model(**kwargs):
         bias=kwargs['bias'])
 
 
+def get_batch_loader(dset: torch.utils.data.Dataset,
+                     batch_size: int,
+                     pin_memory: bool = False):
+    """ DataLoader that fetches each batch with one `dset[indices]` call,
+        instead of one call per example and collating afterwards """
+    return torch.utils.data.DataLoader(
+        dset, batch_size=None, pin_memory=pin_memory,
+        sampler=torch.utils.data.BatchSampler(
+            torch.utils.data.SequentialSampler(dset),
+            batch_size=batch_size, drop_last=False))
+
+
 def count_and_stringify(x):
     return {str(k): str(v) for k, v in dict(Counter(x)).items()}
 
@@ -56,9 +68,13 @@ def evaluate(downstream_tasks: List[str],
              early_stopping: bool = False,
              split_ratio: float = 0.2,
              patience: int = 5,
-             verbose: int = 0):
+             verbose: int = 0,
+             cachefolder: str = None,
+             cachekey: str = None,
+             dtype: torch.dtype = torch.float32):
     # set device
     device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    pin_memory = device.type == "cuda"
     # start
     results = []
     for downstream_task in downstream_tasks:
@@ -68,202 +84,240 @@ def evaluate(downstream_tasks: List[str],
 
         if downstream_task == "ABSD-1":
             ds_train = GermEval17(
-                preprocesser, datafolder=datafolder,
+                preprocesser, datafolder=datafolder, cachefolder=cachefolder,
+                cachekey=cachekey, dtype=dtype,
                 task="Relevance", test=False, split_ratio=split_ratio,
                 early_stopping=early_stopping)
             print("train:", ds_train)
             ds_test = GermEval17(
-                preprocesser, datafolder=datafolder,
+                preprocesser, datafolder=datafolder, cachefolder=cachefolder,
+                cachekey=cachekey, dtype=dtype,
                 task="Relevance", test=True)
             print(" test:", ds_test)
         elif downstream_task == "ABSD-2":
             ds_train = GermEval17(
-                preprocesser, datafolder=datafolder,
+                preprocesser, datafolder=datafolder, cachefolder=cachefolder,
+                cachekey=cachekey, dtype=dtype,
                 task="Sentiment", test=False, split_ratio=split_ratio,
                 early_stopping=early_stopping)
             print("train:", ds_train)
             ds_test = GermEval17(
-                preprocesser, datafolder=datafolder,
+                preprocesser, datafolder=datafolder, cachefolder=cachefolder,
+                cachekey=cachekey, dtype=dtype,
                 task="Sentiment", test=True)
             print(" test:", ds_test)
         elif downstream_task == "ABSD-3":
             ds_train = GermEval17(
-                preprocesser, datafolder=datafolder,
+                preprocesser, datafolder=datafolder, cachefolder=cachefolder,
+                cachekey=cachekey, dtype=dtype,
                 task="Category", test=False, split_ratio=split_ratio,
                 early_stopping=early_stopping)
             print("train:", ds_train)
             ds_test = GermEval17(
-                preprocesser, datafolder=datafolder,
+                preprocesser, datafolder=datafolder, cachefolder=cachefolder,
+                cachekey=cachekey, dtype=dtype,
                 task="Category", test=True)
             print(" test:", ds_test)
 
         elif downstream_task == "OL18-A":
             ds_train = GermEval18(
-                preprocesser, datafolder=datafolder,
+                preprocesser, datafolder=datafolder, cachefolder=cachefolder,
+                cachekey=cachekey, dtype=dtype,
                 task="A", test=False, split_ratio=split_ratio,
                 early_stopping=early_stopping)
             print("train:", ds_train)
             ds_test = GermEval18(
-                preprocesser, datafolder=datafolder,
+                preprocesser, datafolder=datafolder, cachefolder=cachefolder,
+                cachekey=cachekey, dtype=dtype,
                 task="A", test=True)
             print(" test:", ds_test)
         elif downstream_task == "OL18-B":
             ds_train = GermEval18(
-                preprocesser, datafolder=datafolder,
+                preprocesser, datafolder=datafolder, cachefolder=cachefolder,
+                cachekey=cachekey, dtype=dtype,
                 task="B", test=False, split_ratio=split_ratio,
                 early_stopping=early_stopping)
             print("train:", ds_train)
             ds_test = GermEval18(
-                preprocesser, datafolder=datafolder,
+                preprocesser, datafolder=datafolder, cachefolder=cachefolder,
+                cachekey=cachekey, dtype=dtype,
                 task="B", test=True)
             print(" test:", ds_test)
 
         elif downstream_task == "OL19-A":
             ds_train = GermEval19(
-                preprocesser, datafolder=datafolder,
+                preprocesser, datafolder=datafolder, cachefolder=cachefolder,
+                cachekey=cachekey, dtype=dtype,
                 task="A", test=False, split_ratio=split_ratio,
                 early_stopping=early_stopping)
             print("train:", ds_train)
             ds_test = GermEval19(
-                preprocesser, datafolder=datafolder,
+                preprocesser, datafolder=datafolder, cachefolder=cachefolder,
+                cachekey=cachekey, dtype=dtype,
                 task="A", test=True)
             print(" test:", ds_test)
         elif downstream_task == "OL19-B":
             ds_train = GermEval19(
-                preprocesser, datafolder=datafolder,
+                preprocesser, datafolder=datafolder, cachefolder=cachefolder,
+                cachekey=cachekey, dtype=dtype,
                 task="B", test=False, split_ratio=split_ratio,
                 early_stopping=early_stopping)
             print("train:", ds_train)
             ds_test = GermEval19(
-                preprocesser, datafolder=datafolder,
+                preprocesser, datafolder=datafolder, cachefolder=cachefolder,
+                cachekey=cachekey, dtype=dtype,
                 task="B", test=True)
             print(" test:", ds_test)
         elif downstream_task == "OL19-C":
             ds_train = GermEval19(
-                preprocesser, datafolder=datafolder,
+                preprocesser, datafolder=datafolder, cachefolder=cachefolder,
+                cachekey=cachekey, dtype=dtype,
                 task="C", test=False, split_ratio=split_ratio,
                 early_stopping=early_stopping)
             print("train:", ds_train)
             ds_test = GermEval19(
-                preprocesser, datafolder=datafolder,
+                preprocesser, datafolder=datafolder, cachefolder=cachefolder,
+                cachekey=cachekey, dtype=dtype,
                 task="C", test=True)
             print(" test:", ds_test)
 
         elif downstream_task == "TOXIC":
             ds_train = GermEval21(
-                preprocesser, datafolder=datafolder,
+                preprocesser, datafolder=datafolder, cachefolder=cachefolder,
+                cachekey=cachekey, dtype=dtype,
                 task="TOXIC", test=False, split_ratio=split_ratio,
                 early_stopping=early_stopping)
             print("train:", ds_train)
             ds_test = GermEval21(
-                preprocesser, datafolder=datafolder,
+                preprocesser, datafolder=datafolder, cachefolder=cachefolder,
+                cachekey=cachekey, dtype=dtype,
                 task="TOXIC", test=True)
             print(" test:", ds_test)
         elif downstream_task == "ENGAGE":
             ds_train = GermEval21(
-                preprocesser, datafolder=datafolder,
+                preprocesser, datafolder=datafolder, cachefolder=cachefolder,
+                cachekey=cachekey, dtype=dtype,
                 task="ENGAGE", test=False, split_ratio=split_ratio,
                 early_stopping=early_stopping)
             print("train:", ds_train)
             ds_test = GermEval21(
-                preprocesser, datafolder=datafolder,
+                preprocesser, datafolder=datafolder, cachefolder=cachefolder,
+                cachekey=cachekey, dtype=dtype,
                 task="ENGAGE", test=True)
             print(" test:", ds_test)
         elif downstream_task == "FCLAIM":
             ds_train = GermEval21(
-                preprocesser, datafolder=datafolder,
+                preprocesser, datafolder=datafolder, cachefolder=cachefolder,
+                cachekey=cachekey, dtype=dtype,
                 task="FCLAIM", test=False, split_ratio=split_ratio,
                 early_stopping=early_stopping)
             print("train:", ds_train)
             ds_test = GermEval21(
-                preprocesser, datafolder=datafolder,
+                preprocesser, datafolder=datafolder, cachefolder=cachefolder,
+                cachekey=cachekey, dtype=dtype,
                 task="FCLAIM", test=True)
             print(" test:", ds_test)
 
         elif downstream_task == "VMWE":
             ds_train = GermEval21vmwe(
-                preprocesser, datafolder=datafolder,
+                preprocesser, datafolder=datafolder, cachefolder=cachefolder,
+                cachekey=cachekey, dtype=dtype,
                 test=False, split_ratio=split_ratio,
                 early_stopping=early_stopping)
             print("train:", ds_train)
             ds_test = GermEval21vmwe(
-                preprocesser, datafolder=datafolder,
+                preprocesser, datafolder=datafolder, cachefolder=cachefolder,
+                cachekey=cachekey, dtype=dtype,
                 test=True)
             print(" test:", ds_test)
 
         elif downstream_task == "MIO-S":
             ds_train = MillionSentiment(
-                preprocesser, datafolder=datafolder,
+                preprocesser, datafolder=datafolder, cachefolder=cachefolder,
+                cachekey=cachekey, dtype=dtype,
                 test=False, split_ratio=split_ratio,
                 early_stopping=early_stopping)
             print("train:", ds_train)
             ds_test = MillionSentiment(
-                preprocesser, datafolder=datafolder,
+                preprocesser, datafolder=datafolder, cachefolder=cachefolder,
+                cachekey=cachekey, dtype=dtype,
                 test=True)
             print(" test:", ds_test)
         elif downstream_task in ['MIO-O', 'MIO-I', 'MIO-D', 'MIO-F', 'MIO-P',
                                  'MIO-A']:
             ds_train = MillionBinary(
-                preprocesser, datafolder=datafolder,
+                preprocesser, datafolder=datafolder, cachefolder=cachefolder,
+                cachekey=cachekey, dtype=dtype,
                 test=False, task=downstream_task, split_ratio=split_ratio,
                 early_stopping=early_stopping)
             print("train:", ds_train)
             ds_test = MillionBinary(
-                preprocesser, datafolder=datafolder,
+                preprocesser, datafolder=datafolder, cachefolder=cachefolder,
+                cachekey=cachekey, dtype=dtype,
                 test=True, task=downstream_task)
             print(" test:", ds_test)
 
         elif downstream_task == "SBCH-L":
             ds_train = SBCHisSwiss(
-                preprocesser, datafolder=datafolder,
+                preprocesser, datafolder=datafolder, cachefolder=cachefolder,
+                cachekey=cachekey, dtype=dtype,
                 test=False, split_ratio=split_ratio,
                 early_stopping=early_stopping)
             print("train:", ds_train)
             ds_test = SBCHisSwiss(
-                preprocesser, datafolder=datafolder,
+                preprocesser, datafolder=datafolder, cachefolder=cachefolder,
+                cachekey=cachekey, dtype=dtype,
                 test=True)
             print(" test:", ds_test)
         elif downstream_task == "SBCH-S":
             ds_train = SBCHsenti(
-                preprocesser, datafolder=datafolder,
+                preprocesser, datafolder=datafolder, cachefolder=cachefolder,
+                cachekey=cachekey, dtype=dtype,
                 test=False, split_ratio=split_ratio,
                 early_stopping=early_stopping)
             print("train:", ds_train)
             ds_test = SBCHsenti(
-                preprocesser, datafolder=datafolder,
+                preprocesser, datafolder=datafolder, cachefolder=cachefolder,
+                cachekey=cachekey, dtype=dtype,
                 test=True)
             print(" test:", ds_test)
 
         elif downstream_task == "ARCHI":
             ds_train = ArchiMob(
-                preprocesser, datafolder=datafolder,
+                preprocesser, datafolder=datafolder, cachefolder=cachefolder,
+                cachekey=cachekey, dtype=dtype,
                 test=False, split_ratio=split_ratio,
                 early_stopping=early_stopping)
             print("train:", ds_train)
             ds_test = ArchiMob(
-                preprocesser, datafolder=datafolder,
+                preprocesser, datafolder=datafolder, cachefolder=cachefolder,
+                cachekey=cachekey, dtype=dtype,
                 test=True)
             print(" test:", ds_test)
 
         elif downstream_task == "LSDC":
             ds_train = LSDC(
-                preprocesser, datafolder=datafolder,
+                preprocesser, datafolder=datafolder, cachefolder=cachefolder,
+                cachekey=cachekey, dtype=dtype,
                 test=False, split_ratio=split_ratio,
                 early_stopping=early_stopping)
             print("train:", ds_train)
             ds_test = LSDC(
-                preprocesser, datafolder=datafolder,
+                preprocesser, datafolder=datafolder, cachefolder=cachefolder,
+                cachekey=cachekey, dtype=dtype,
                 test=True)
             print(" test:", ds_test)
 
         elif downstream_task == "KLEX-P":
             ds_train = KLEX(
-                preprocesser, datafolder=datafolder,
+                preprocesser, datafolder=datafolder, cachefolder=cachefolder,
+                cachekey=cachekey, dtype=dtype,
                 test=False, split_ratio=split_ratio,
                 early_stopping=early_stopping)
             print("train:", ds_train)
             ds_test = KLEX(
-                preprocesser, datafolder=datafolder,
+                preprocesser, datafolder=datafolder, cachefolder=cachefolder,
+                cachekey=cachekey, dtype=dtype,
                 test=True)
             print(" test:", ds_test)
 
@@ -275,8 +329,7 @@ def evaluate(downstream_tasks: List[str],
         X_valid, y_valid = ds_train.get_validation_set()
         n_classes = ds_train.num_classes()
         n_features = ds_train.num_features()
-        dgen = torch.utils.data.DataLoader(
-            ds_train, batch_size=batch_size, shuffle=False)
+        dgen = get_batch_loader(ds_train, batch_size, pin_memory)
 
         # init new model
         if not isinstance(modelbuilder, types.FunctionType):
@@ -302,7 +355,8 @@ def evaluate(downstream_tasks: List[str],
         # early stopping
         if y_valid is not None:
             with torch.no_grad():
-                X_valid, y_valid = X_valid.to(device), y_valid.to(device)
+                X_valid = X_valid.to(device, non_blocking=True)
+                y_valid = y_valid.to(device, non_blocking=True)
                 valid_loss = loss_fn(model(X_valid), y_valid).item()
                 wait = 0
 
@@ -315,7 +369,8 @@ def evaluate(downstream_tasks: List[str],
             # train
             epoch_loss = 0.
             for X_train, y_train in dgen:
-                X_train, y_train = X_train.to(device), y_train.to(device)
+                X_train = X_train.to(device, non_blocking=True)
+                y_train = y_train.to(device, non_blocking=True)
                 torch.cuda.empty_cache()  # del previous batch from GPU RAM
                 # train it
                 optimizer.zero_grad()
@@ -347,13 +402,13 @@ def evaluate(downstream_tasks: List[str],
         torch.cuda.empty_cache()
 
         # inference on test dataset
-        dgen_test = torch.utils.data.DataLoader(
-            ds_test, batch_size=batch_size, shuffle=False)
+        dgen_test = get_batch_loader(ds_test, batch_size, pin_memory)
         y_test = []
         y_pred = []
         for X, y in dgen_test:
             y_test.append(y.to('cpu'))
-            y_pred.append(torch.argmax(model(X.to(device)), dim=1).to('cpu'))
+            y_pred.append(torch.argmax(
+                model(X.to(device, non_blocking=True)), dim=1).to('cpu'))
             torch.cuda.empty_cache()  # del previous batch from GPU RAM
 
         y_test = torch.cat(y_test).detach().numpy()
@@ -376,13 +431,13 @@ def evaluate(downstream_tasks: List[str],
         torch.cuda.empty_cache()
 
         # inference on training datatsets
-        dgen_train = torch.utils.data.DataLoader(
-            ds_train, batch_size=batch_size, shuffle=False)
+        dgen_train = get_batch_loader(ds_train, batch_size, pin_memory)
         y_train = []
         y_pred = []
         for X, y in dgen_train:
             y_train.append(y.to('cpu'))
-            y_pred.append(torch.argmax(model(X.to(device)), dim=1).to('cpu'))
+            y_pred.append(torch.argmax(
+                model(X.to(device, non_blocking=True)), dim=1).to('cpu'))
             torch.cuda.empty_cache()  # del previous batch from GPU RAM
 
         y_train = torch.cat(y_train).detach().numpy()
@@ -30,7 +30,7 @@ setuptools.setup(
     license='Apache License 2.0',
     packages=['sentence_embedding_evaluation_german'],
     install_requires=[
-        "torch>=1.1.0,<2",
+        "torch>=1.2.0,<2",
         "pandas>=1.3.5,<2",
         "scikit-learn>=1.0.2,<2"
     ],